@@ -19,32 +19,59 @@
 from __future__ import annotations
 
 import csv
+import io
 import secrets
+import string
 import argparse
 import os
 import sys
 import re
+import itertools
+import unicodedata
 
+from operator import attrgetter
+from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import (
     Dict,
     List,
     Tuple,
     Set,
+    FrozenSet,
     Optional,
-    Any
+    Any,
+    Iterator
 )
 INVALID_CHARACTERS = "áéíóúñÁÉÍÓÚÑ"
 REPLACEMENT_CHARACTERS = "aeiounAEIOUN"
+_ACCENT_TABLE = str.maketrans(INVALID_CHARACTERS, REPLACEMENT_CHARACTERS)
+# removes the Spanish accents and lowercases at the same time
+_EMAIL_USER_TABLE = str.maketrans(INVALID_CHARACTERS + string.ascii_uppercase,
+                                  REPLACEMENT_CHARACTERS.lower() + string.ascii_lowercase)
+# diacritics left as separate characters by the NFKD normalization
+_COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+# academic year such as 2021-2022. The first year is captured
+_ACADEMIC_YEAR = re.compile(r"(\d+)[-/\s]\d+")
 
 EXPECTED_COLS_STUDENT = 3
 
+# 1 MiB instead of the default 8 KiB so that big csvs are written with fewer syscalls
+WRITE_BUFFER_SIZE = 1 << 20
+
 FIRSTNAME = "First Name [Required]"
 LASTNAME = "Last Name [Required]"
 EMAIL = "Email Address [Required]"
 ORG_UNIT_PATH = "Org Unit Path [Required]"
 PASSWORD = "Password [Required]"
 CHANGE_PASSWORD = "Change Password at Next Sign-In"
+# attribute of SchoolPerson written in each column of the Google csv. Any other column is left empty
+CSV_ATTRIBUTES = {
+    FIRSTNAME: "firstname",
+    LASTNAME: "lastname",
+    EMAIL: "email",
+    PASSWORD: "password",
+    ORG_UNIT_PATH: "org_path_unit",
+}
 
 RESET = "\u001b[0m"
 BRIGHT_YELLOW = "\u001b[33;1m"
@@ -53,37 +80,48 @@ BRIGHT_RED = "\u001b[31;1m"
 BRIGHT_CYAN = "\u001b[36;1m"
 BRIGHT_BLUE = "\u001b[34;1m"
 
-def with_color(text: str, code: str) -> str:
-    return f"{code}{text}{RESET}"
+# escape codes are only useful when the output is shown in a terminal
+if sys.stdout.isatty():
+    def with_color(text: str, code: str) -> str:
+        return f"{code}{text}{RESET}"
+else:
+    def with_color(text: str, code: str) -> str:
+        return str(text)
+
+NEW_ENROLLMENT_TAG = with_color("[NUEVA MATRÍCULA] ", BRIGHT_GREEN)
+STRANGE_CASE_TAG = with_color("[CASO EXTRAÑO] ", BRIGHT_YELLOW)
+WARNING_TAG = with_color("[AVISO]", BRIGHT_YELLOW)
 
 class IncorrectCsvValueError(Exception):
     pass
 
 class NaiveLogger:
 
-    _ansi_esc_code_regex = re.compile(r"\\x[a-z0-9]+\[\d+;?\d*m")
+    _ansi_esc_code_regex = re.compile(r"\x1b\[[0-9;]*m")
 
     def __init__(self):
         self.messages: List[str] = []
+        # when True, only errors are printed. Every message is still saved for the log file
+        self.quiet = False
 
     def show_error(self, msg: str) -> None:
-        self.__add_and_show(with_color(f"[ERROR] {msg}", BRIGHT_RED))
+        self.__add_and_show(with_color(f"[ERROR] {msg}", BRIGHT_RED), always_print=True)
 
     def show_info(self, msg: str) -> None:
         self.__add_and_show(msg)
 
     def show_warning(self, msg: str) -> None:
-        self.__add_and_show(f"{with_color('[AVISO]', BRIGHT_YELLOW)} {msg}")
+        self.__add_and_show(f"{WARNING_TAG} {msg}")
 
-    def __add_and_show(self, msg) -> None:
-        print(msg)
-        raw = repr(msg)
-        self.messages.append(raw[1:-1] + "\n")
+    def __add_and_show(self, msg, always_print: bool = False) -> None:
+        if always_print or not self.quiet:
+            print(msg)
+        self.messages.append(msg + "\n")
 
     def write_log_file(self, filename):
-        without_esc_codes_msgs = [self._ansi_esc_code_regex.sub("", msg) for msg in self.messages]
+        # escape codes are removed with a single pass and only if the log file is requested
         with open(filename, "w") as file:
-            file.writelines(without_esc_codes_msgs)
+            file.write(self._ansi_esc_code_regex.sub("", "".join(self.messages)))
 
 logger = NaiveLogger()
 
@@ -99,6 +137,8 @@ def get_args() -> argparse.Namespace:
     parser.add_argument("--registro", "-r", metavar="nombre-archivo-registro", action="store", dest="log_filename",
                         help="Nombre del archivo txt con toda la información"
                                 " mostrada en la terminal")
+    parser.add_argument("--silencioso", "-q", action="store_true", dest="quiet",
+                        help="Solo muestra los errores en la terminal")
 
 
     subparser = parser.add_subparsers(dest="action")
@@ -126,17 +166,19 @@ def get_args() -> argparse.Namespace:
     return parser.parse_args()
 
 def random_number_only_password(digits) -> str:
-    password = str(1 + secrets.randbelow(9))
-    password += "".join([str(secrets.randbelow(10)) for _ in range(digits - 1)])
-    return password
-
-def remove_accent(letter) -> str:
-    if letter in INVALID_CHARACTERS:
-        return REPLACEMENT_CHARACTERS[INVALID_CHARACTERS.index(letter)]
-    return letter
+    # a single random number with the given amount of digits, so the first one is never 0
+    lowest = 10 ** (digits - 1)
+    return str(lowest + secrets.randbelow(10 ** digits - lowest))
 
 def remove_all_accents(word) -> str:
-    return "".join(remove_accent(letter) for letter in word)
+    # most names are plain ASCII and do not need to be normalized
+    if word.isascii():
+        return word
+    # the table covers the Spanish accents, the normalization is only needed for any other diacritic
+    word = word.translate(_ACCENT_TABLE)
+    if word.isascii():
+        return word
+    return _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", word))
 
 @dataclass(frozen=True)
 class SchoolContext:
@@ -145,80 +187,95 @@ class SchoolContext:
     current_year: str = ""
 
     fieldnames: Optional[List[str]] = field(default=None, repr=False)
-    all_names: Optional[Set[str]] = field(default=None, repr=False)
+    all_names: Optional[FrozenSet[Tuple[str, str]]] = field(default=None, repr=False)
     all_emails: Optional[Set[str]] = field(default=None, repr=False)
 
 class SchoolPerson:
 
+    __slots__ = ("firstname", "lastname", "_password", "email", "org_path_unit", "_first_surname",
+                 "_firstname_initial")
+
     # also matches usernames of the form juan.perez@iesuninstituo.es
     _email_regex = re.compile(r"([A-Za-z\.]+)(\d*)@")
 
     def __init__(self, firstname: str, lastname: str):
         self.firstname = firstname
+        # names come already stripped from parse_csv
         self.lastname = lastname
-        self.password = random_number_only_password(8)
+        # generated the first time it is needed
+        self._password: Optional[str] = None
         
         self.email: str = ""
         self.org_path_unit = ""
 
-    def as_csv_dict(self) -> Dict[str, str]:
-        return {
-            FIRSTNAME: self.firstname,
-            LASTNAME: self.lastname,
-            EMAIL: self.email,
-            PASSWORD: self.password,
-            ORG_UNIT_PATH: self.org_path_unit,
-            CHANGE_PASSWORD: "TRUE"
-        }
+        # computed once since they are used to build the email
+        self._first_surname = self.lastname.split(None, 1)[0] if self.lastname else ""
+        self._firstname_initial = firstname[:1]
 
     @property
-    def fullname(self) -> str:
-        return f"{self.firstname} {self.lastname.strip()}"
-
-    def update_email_user(self) -> None:
-        self.email = self._email_regex.sub(self._new_user_name_email, self.email)
+    def password(self) -> str:
+        if self._password is None:
+            self._password = random_number_only_password(8)
+        return self._password
+
+    def alternative_emails(self) -> Iterator[str]:
+        # the email is parsed once and then every candidate is built by only changing the number
+        match = self._email_regex.search(self.email)
+        if not match:
+            raise ValueError("Formato de email no ha podido ser reconocido")
+        prefix, suffix = self.email[:match.start()], self.email[match.end():]
+        main_user_name, last_nums = match.groups()
+        for nums in self._next_email_numbers(last_nums):
+            yield f"{prefix}{main_user_name}{nums}@{suffix}"
 
     def build_email(self, domain: str) -> None:
         raise NotImplementedError("Método implementado en clases descendientes")
 
+    def _base_email_user(self) -> str:
+        # first letter of the name and first surname, lowercased and without accents
+        user_name = (self._firstname_initial + self._first_surname).translate(_EMAIL_USER_TABLE)
+        if not user_name.isascii():
+            # characters not included in the table
+            user_name = remove_all_accents(user_name.lower())
+        return user_name
+
     @classmethod
-    def from_csv(cls, csv_data: Any) -> SchoolPerson:
+    def parse_csv(cls, csv_data: Any) -> Tuple[str, ...]:
+        # returns the arguments of the constructor. The first two are always firstname and lastname
         raise NotImplementedError("Método implementado en clases descendientes")
 
-    def _new_user_name_email(self, match: re.Match) -> str:
-        if not match:
-            raise ValueError("Formato de email no ha podido ser reconocido")
-        return ""
+    @staticmethod
+    def _split_delphos_name(name: str) -> Tuple[str, str]:
+        # Delphos writes names as "lastname, firstname"
+        lastname, sep, firstname = name.partition(", ")
+        if not sep or ", " in firstname:
+            raise IncorrectCsvValueError("Nombre formato incorrecto", name)
+        return firstname.strip(), lastname.strip()
+
+    def _next_email_numbers(self, last_nums: str) -> Iterator[str]:
+        raise NotImplementedError("Método implementado en clases descendientes")
 
     def __str__(self) -> str:
         return f"{self.firstname} {self.lastname} ({self.email})"
 
 class Teacher(SchoolPerson):
-    
+
+    __slots__ = ()
+
     def __init__(self, firstname: str, lastname: str):
         super().__init__(firstname, lastname)
 
     def build_email(self, domain: str) -> None:
-        first_surname = self.lastname.split()[0]
-        username = remove_all_accents(self.firstname[0].lower() + first_surname.lower())
+        username = self._base_email_user()
         self.email = f"{username}@{domain}"
 
     @classmethod
-    def from_csv(cls, csv_data: str) -> Teacher:
-        name_list = csv_data[0].split(", ")
-        if len(name_list) != 2:
-            raise IncorrectCsvValueError("Nombre formato incorrecto", csv_data[0])
-        lastname, firstname = name_list
-        return cls(firstname.strip(), lastname.strip())
+    def parse_csv(cls, csv_data: List[str]) -> Tuple[str, str]:
+        return cls._split_delphos_name(csv_data[0])
 
-    def _new_user_name_email(self, match: re.Match) -> str:
-        super()._new_user_name_email(match)
-
-        main_user_name, last_nums = match.groups()
-
-        if last_nums:
-            f"{main_user_name}{int(last_nums) + 1}@"
-        return f"{main_user_name}2@"
+    def _next_email_numbers(self, last_nums: str) -> Iterator[str]:
+        start = int(last_nums) + 1 if last_nums else 2
+        return map(str, itertools.count(start))
 
     def __repr__(self) -> str:
         return (f"{self.__class__.__name__}(firstname={self.firstname}, "
@@ -226,6 +283,8 @@ class Teacher(SchoolPerson):
 
 class Student(SchoolPerson):
 
+    __slots__ = ("enrollment_id", "enrollment_year", "course")
+
     def __init__(self, firstname: str, lastname: str, course: str, enrollment_id: str):
         super().__init__(firstname, lastname)
         self.enrollment_id = enrollment_id
@@ -233,42 +292,31 @@ class Student(SchoolPerson):
         self.course = course
 
     def build_email(self, domain) -> str:
-        first_surname = self.lastname.split()[0]
-        user_name = remove_all_accents(self.firstname[0].lower() + first_surname.lower())
+        user_name = self._base_email_user()
         # add the two last digit of the enrollment id. I did not choose this criteria to create emails. Someone
         # before me did it.
         user_name += self.enrollment_id[-2:]
         self.email = f"{user_name}@{domain}"
 
-    def _new_user_name_email(self, match: re.Match) -> str:
-        super()._new_user_name_email(match)
-
+    def _next_email_numbers(self, last_nums: str) -> Iterator[str]:
         # these rules were imposed to me
-        main_user_name, last_nums = match.groups()
-        next_nums = int(last_nums) + 1
-        if next_nums < 10:
-            next_nums = f"0{next_nums}"
-        return f"{main_user_name}{next_nums}@"
+        return (f"{nums:02d}" for nums in itertools.count(int(last_nums) + 1))
 
     @classmethod
-    def from_csv(cls, csv_data: List[str]) -> Student:
+    def parse_csv(cls, csv_data: List[str]) -> Tuple[str, str, str, str]:
         if len(csv_data) < EXPECTED_COLS_STUDENT:
             raise IncorrectCsvValueError("Número de columnas incorrecto", len(csv_data))
 
-        name_list = csv_data[0].split(", ")
-        if len(name_list) != 2:
-            raise IncorrectCsvValueError("Nombre formato incorrecto", csv_data[0])
-        lastname, firstname = name_list
+        firstname, lastname = cls._split_delphos_name(csv_data[0])
 
-        divide_course_list = csv_data[1].split("º ")
-        if len(divide_course_list) != 2:
+        if csv_data[1].count("º ") != 1:
             raise IncorrectCsvValueError("Curso formato incorrecto", csv_data[1])
-        course = "-".join(divide_course_list)
+        course = csv_data[1].replace("º ", "-")
 
         enrollment_id = csv_data[2]
 
         # strip just in case
-        return cls(firstname.strip(), lastname.strip(), course.strip(), enrollment_id.strip())
+        return firstname, lastname, course.strip(), enrollment_id.strip()
 
     def __repr__(self) -> str:
         return (f"{self.__class__.__name__}(firstname={self.firstname}, "
@@ -276,108 +324,150 @@ class Student(SchoolPerson):
                 f"enrollment_id={self.enrollment_id})")
 
 def change_email_if_needed(person: SchoolPerson, all_emails: Set[str]) -> None:
-    while person.email in all_emails:
-        old_email = person.email
-        person.update_email_user()
-        logger.show_warning(f"{old_email} ya existe. Cambiándolo a {person.email}")
+    if person.email in all_emails:
+        for email in person.alternative_emails():
+            logger.show_warning(f"{person.email} ya existe. Cambiándolo a {email}")
+            person.email = email
+            if email not in all_emails:
+                break
 
     all_emails.add(person.email)
 
+def write_csv_rows(context: SchoolContext, people: List[SchoolPerson], csv_file: Any) -> None:
+    # people are transposed into one tuple per column so that the values are extracted
+    # and put in the order of the Google csv by C code instead of row by row
+    get_values = attrgetter(*CSV_ATTRIBUTES.values())
+    columns = dict(zip(CSV_ATTRIBUTES, zip(*map(get_values, people))))
+    columns[CHANGE_PASSWORD] = ("TRUE",) * len(people)
+    empty_column = ("",) * len(people)
+
+    csv_writer = csv.writer(csv_file)
+    csv_writer.writerow(context.fieldnames)
+    csv_writer.writerows(zip(*(columns.get(name, empty_column) for name in context.fieldnames)))
+
+def write_csv_file(context: SchoolContext, people: List[SchoolPerson], filename: str) -> None:
+    with open(filename, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as csv_file:
+        write_csv_rows(context, people, csv_file)
+
 def write_teachers_csv(context: SchoolContext, teachers: List[Teacher], csv_filename: str) -> None:
-    with open(csv_filename, "w") as csv_file:
-        csv_writer = csv.DictWriter(csv_file, context.fieldnames)
-        csv_writer.writeheader()
-        for teacher in teachers:
-            if teacher.fullname not in context.all_names:
-                teacher.org_path_unit = context.org_path_unit + "Profesores"
-                teacher.build_email(context.domain)
-                change_email_if_needed(teacher, context.all_emails)
-                logger.show_info(f"Creando {with_color(teacher.fullname + ' (' + teacher.email + ')', BRIGHT_BLUE)} "
-                                    f"en {with_color(teacher.org_path_unit, BRIGHT_CYAN)}")
-
-                csv_writer.writerow(teacher.as_csv_dict())
-
-def write_student_course_csv(context: SchoolContext, course_students: List[Student], org_path: str, filename: str) -> None:
-    non_existant_students = [student for student in course_students if student.fullname not in context.all_names]
-
-    if non_existant_students:
-        with open(filename, "w") as csv_file:
-            csv_writer = csv.DictWriter(csv_file, context.fieldnames)
-            csv_writer.writeheader()
-            for student in non_existant_students:
-                student.build_email(context.domain)
-                student.org_path_unit = context.org_path_unit + org_path
-
-                change_email_if_needed(student, context.all_emails)
-                text = f"Creando {with_color(student, BRIGHT_BLUE)} en {with_color(student.org_path_unit, BRIGHT_CYAN)}"
-                if student.enrollment_year == context.current_year:
-                    text = with_color("[NUEVA MATRÍCULA] ", BRIGHT_GREEN) + text
-                else:
-                    text = with_color("[CASO EXTRAÑO] ", BRIGHT_YELLOW) + text
-                logger.show_info(text)
-                csv_writer.writerow(student.as_csv_dict())
-    elif course_students:
-        logger.show_warning(f"No hay ningún alumno nuevo de {course_students[0].course}")
+    # local names for everything used inside the loop
+    all_emails, domain = context.all_emails, context.domain
+    org_path_unit = context.org_path_unit + "Profesores"
+    colored_org_path_unit = with_color(org_path_unit, BRIGHT_CYAN)
+    show_info = logger.show_info
+
+    for teacher in teachers:
+        teacher.org_path_unit = org_path_unit
+        teacher.build_email(domain)
+        change_email_if_needed(teacher, all_emails)
+        show_info(f"Creando {with_color(teacher, BRIGHT_BLUE)} en {colored_org_path_unit}")
+
+    write_csv_file(context, teachers, csv_filename)
+
+def write_student_course_csv(context: SchoolContext, course: str, new_students: List[Student], org_path: str,
+                             filename: str) -> None:
+    if new_students:
+        # local names for everything used inside the loop
+        all_emails, domain, current_year = context.all_emails, context.domain, context.current_year
+        org_path_unit = context.org_path_unit + org_path
+        colored_org_path_unit = with_color(org_path_unit, BRIGHT_CYAN)
+        show_info = logger.show_info
+
+        for student in new_students:
+            student.build_email(domain)
+            student.org_path_unit = org_path_unit
+
+            change_email_if_needed(student, all_emails)
+            text = f"Creando {with_color(student, BRIGHT_BLUE)} en {colored_org_path_unit}"
+            if student.enrollment_year == current_year:
+                text = NEW_ENROLLMENT_TAG + text
+            else:
+                text = STRANGE_CASE_TAG + text
+            show_info(text)
+
+        write_csv_file(context, new_students, filename)
     else:
-        logger.show_error("La lista 'course_students' no tiene ningún estudiante")
+        logger.show_warning(f"No hay ningún alumno nuevo de {course}")
 
 def get_student_csv_filenames(directory: str) -> List[str]:
-    return [os.path.join(directory, file) for file in os.listdir(directory) if file.endswith(".csv")]
-
-def load_students(csv_filenames: List[str]) -> Dict[str, Student]:
-    course_to_student = {}
-
-    for csv_filename in csv_filenames:
-        with open(csv_filename, encoding="latin_1") as csv_file:
-            csv_reader = csv.reader(csv_file)
-            next(csv_reader)
-            for row in csv_reader:
-                try:
-                    student = Student.from_csv(row)
-                except IncorrectCsvValueError as exc:
-                    logger.show_error(f"Valor en csv de estudiante no permitido: {exc.args}")
-                    sys.exit(1)
-                if student.course not in course_to_student:
-                    course_to_student[student.course] = []
-                course_to_student[student.course].append(student)
-
-    return course_to_student
+    with os.scandir(directory) as entries:
+        return [entry.path for entry in entries if entry.name.endswith(".csv") and entry.is_file()]
+
+def read_delphos_csv(csv_filename: str) -> Iterator[List[str]]:
+    # the whole file is read and decoded with a single call instead of line by line. The raw bytes
+    # are decoded directly, skipping the TextIOWrapper decoder
+    with open(csv_filename, "rb") as csv_file:
+        csv_reader = csv.reader(io.StringIO(csv_file.read().decode("latin_1"), newline=""))
+    # ignore first row
+    next(csv_reader)
+    return csv_reader
+
+def load_students(csv_filenames: List[str], all_names: FrozenSet[Tuple[str, str]]) -> Dict[str, List[Student]]:
+    # only the students that are not in Google Suite are created. Every course is included
+    # in the dictionary even if all of its students already exist
+    course_to_student = defaultdict(list)
+    parse_csv = Student.parse_csv
+
+    try:
+        for csv_filename in csv_filenames:
+            for row in read_delphos_csv(csv_filename):
+                firstname, lastname, course, enrollment_id = parse_csv(row)
+                course_students = course_to_student[course]
+                if (firstname, lastname) not in all_names:
+                    course_students.append(Student(firstname, lastname, course, enrollment_id))
+    except IncorrectCsvValueError as exc:
+        logger.show_error(f"Valor en csv de estudiante no permitido: {exc.args}")
+        sys.exit(1)
+
+    return dict(course_to_student)
 
 def load_course_unit_path(csv_filename: str) -> List[Tuple[str, str]]:
     with open(csv_filename) as csv_file:
         csv_reader = csv.reader(csv_file)
         return [(row[1], row[0]) for row in csv_reader]
 
-def load_teachers(csv_filename: str) -> List[Teacher]:
-    with open(csv_filename, encoding="latin_1") as csv_file:
+def load_teachers(csv_filename: str, all_names: FrozenSet[Tuple[str, str]]) -> List[Teacher]:
+    # only the teachers that are not in Google Suite are created
+    try:
+        names = map(Teacher.parse_csv, read_delphos_csv(csv_filename))
+        return [Teacher(*name) for name in names if name not in all_names]
+    except IncorrectCsvValueError as exc:
+        logger.show_error(f"Valor en csv de estudiante no permitido: {exc.args}")
+        sys.exit(1)
+
+def get_google_csv_data(filename: str) -> Tuple[List[str], FrozenSet[Tuple[str, str]], Set[str]]:
+    all_names = set()
+    all_emails = set()
+    # local names for everything used inside the loop
+    add_name, add_email = all_names.add, all_emails.add
+
+    with open(filename, newline="") as csv_file:
         csv_reader = csv.reader(csv_file)
-        # ignore first row
-        next(csv_reader)
-        try:
-            return [Teacher.from_csv(data) for data in csv_reader]
-        except IncorrectCsvValueError as exc:
-            logger.show_error(f"Valor en csv de estudiante no permitido: {exc.args}")
-            sys.exit(1)
-
-def get_google_csv_data(filename: str) -> Tuple[str, Set[str], Set[str]]:
-    with open(filename) as csv_filename:
-        csv_reader = csv.reader(csv_filename)
-        all_names = set()
-        all_emails = set()
-
         fieldnames = next(csv_reader)
+        # checked before any user is loaded. The missing columns would be silently dropped from
+        # the output, for example with the minimal columns export
+        missing_fieldnames = [name for name in (*CSV_ATTRIBUTES, CHANGE_PASSWORD) if name not in fieldnames]
+        if missing_fieldnames:
+            logger.show_error(f"Faltan columnas en el csv de Google: {', '.join(missing_fieldnames)}")
+            sys.exit(1)
 
         for row in csv_reader:
-            name = f"{row[0].strip()} {row[1].strip()}"
-            all_names.add(name)
-            all_emails.add(row[2])
-
-    return fieldnames, all_names, all_emails
-
-def create_context(args: argparse.Namespace, google_data: Tuple[Set[str], Set[str]]) -> SchoolContext:
+            # blank lines are skipped
+            if not row:
+                continue
+            if len(row) < 3:
+                logger.show_error(f"Fila en csv de Google con menos de 3 columnas: {row}")
+                sys.exit(1)
+            add_name((row[0].strip(), row[1].strip()))
+            add_email(row[2])
+
+    return fieldnames, frozenset(all_names), all_emails
+
+def create_context(args: argparse.Namespace,
+                   google_data: Tuple[List[str], FrozenSet[Tuple[str, str]], Set[str]]) -> SchoolContext:
     domain = args.domain
     org_unit_path = f"/Curso {args.year}/"
-    current_year = re.match(r"(\d+)[-/\s]\d+", args.year).group(1)
+    current_year = _ACADEMIC_YEAR.match(args.year).group(1)
 
     fieldnames, all_names, all_emails = google_data
 
@@ -386,14 +476,15 @@ def create_context(args: argparse.Namespace, google_data: Tuple[Set[str], Set[st
 
 def main():
     args = get_args()
+    logger.quiet = args.quiet
     context = create_context(args, get_google_csv_data(args.csv_google))
 
     if args.action == "generar-profesores":
-        all_teachers = load_teachers(args.teacher_csv_file)
-        write_teachers_csv(context, all_teachers, args.output)
+        new_teachers = load_teachers(args.teacher_csv_file, context.all_names)
+        write_teachers_csv(context, new_teachers, args.output)
     elif args.action == "generar-alumnos":
         files_path = get_student_csv_filenames(args.students_directory)
-        course_to_students = load_students(files_path)
+        course_to_students = load_students(files_path, context.all_names)
 
         if not os.path.isdir(args.output):
             os.mkdir(args.output)
@@ -404,14 +495,14 @@ def main():
             for course, unit_path in course_unit_paths:
                 filename = os.path.join(args.output, course + ".csv")
                 if course in course_to_students:
-                    write_student_course_csv(context, course_to_students[course], unit_path, filename)
+                    write_student_course_csv(context, course, course_to_students[course], unit_path, filename)
                 else:
                     logger.show_warning(f"No se ha encontrado el curso {course}")
         else:
             course, unit_path = args.manual
             filename = os.path.join(args.output, course + ".csv")
             if course in course_to_students:
-                write_student_course_csv(context, course_to_students[course], unit_path, filename)
+                write_student_course_csv(context, course, course_to_students[course], unit_path, filename)
             else:
                 logger.show_warning(f"No se ha encontrado el curso {course}")
 